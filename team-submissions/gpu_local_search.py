@@ -2,6 +2,8 @@ import time
 import numpy as np
 import cupy as cp
 
+from multiflip import neighborhood, apply_move
+
 def labs_energy_gpu_batch(spins_batch: "cp.ndarray") -> "cp.ndarray":
     S = spins_batch.astype(cp.int32, copy=False)
     B, N = S.shape
@@ -26,7 +28,18 @@ def make_flip_neighbors(s: np.ndarray, flip_indices: np.ndarray) -> np.ndarray:
     neighbors[np.arange(B), flip_indices] *= -1
     return neighbors
 
-def gpu_best_neighbor_step(s: np.ndarray, B: int, rng: np.random.Generator):
+def gpu_best_neighbor_step(s: np.ndarray, B: int, rng: np.random.Generator, move_set: str = "sampled", k: int = 3):
+    # move_set="sampled": B random single flips, each neighbor evaluated from scratch.
+    # Otherwise a multiflip move set ("1flip", "2flip", "1flip+2flip", "kflip"
+    # with B sampled k-flips) scored on the GPU from the correlation vector.
+    if move_set != "sampled":
+        s_gpu = cp.asarray(s, dtype=cp.int32)
+        moves, E = neighborhood(s_gpu, move_set, k=k, n_samples=B, rng=rng)
+        cp.cuda.runtime.deviceSynchronize()
+        best_i = int(cp.argmin(E).get())
+        best_s = cp.asnumpy(apply_move(s_gpu, moves[best_i]))
+        return best_s, int(E[best_i].get())
+
     N = s.shape[0]
     flips = rng.integers(0, N, size=(B,), dtype=np.int32)
     neigh = make_flip_neighbors(s, flips).astype(np.int32)
@@ -40,7 +53,14 @@ def gpu_best_neighbor_step(s: np.ndarray, B: int, rng: np.random.Generator):
     best_e = int(E[best_i].get())
     return best_s, best_e
 
-def cpu_best_neighbor_step(s: np.ndarray, B: int, rng: np.random.Generator):
+def cpu_best_neighbor_step(s: np.ndarray, B: int, rng: np.random.Generator, move_set: str = "sampled", k: int = 3):
+    # Same move sets as gpu_best_neighbor_step, scored with NumPy so the
+    # speedup compares like for like.
+    if move_set != "sampled":
+        moves, E = neighborhood(s, move_set, k=k, n_samples=B, rng=rng)
+        best_i = int(np.argmin(E))
+        return apply_move(s, moves[best_i]), int(E[best_i])
+
     N = s.shape[0]
     flips = rng.integers(0, N, size=(B,), dtype=np.int32)
     neigh = make_flip_neighbors(s, flips).astype(np.int32)
@@ -54,7 +74,7 @@ def cpu_best_neighbor_step(s: np.ndarray, B: int, rng: np.random.Generator):
             best_s = neigh[i]
     return best_s, int(best_e)
 
-def run_search(N=100, B=4096, steps=50, seed=0):
+def run_search(N=100, B=4096, steps=50, seed=0, move_set="sampled"):
     rng = np.random.default_rng(seed)
     s0 = rng.choice([-1, 1], size=(N,), replace=True).astype(np.int32)
 
@@ -63,7 +83,7 @@ def run_search(N=100, B=4096, steps=50, seed=0):
     best_e_gpu = labs_energy_cpu(s)
     t0 = time.perf_counter()
     for _ in range(steps):
-        cand_s, cand_e = gpu_best_neighbor_step(s, B, rng)
+        cand_s, cand_e = gpu_best_neighbor_step(s, B, rng, move_set=move_set)
         if cand_e <= best_e_gpu:
             s = cand_s
             best_e_gpu = cand_e
@@ -74,13 +94,13 @@ def run_search(N=100, B=4096, steps=50, seed=0):
     best_e_cpu = labs_energy_cpu(s)
     t2 = time.perf_counter()
     for _ in range(steps):
-        cand_s, cand_e = cpu_best_neighbor_step(s, B, rng)
+        cand_s, cand_e = cpu_best_neighbor_step(s, B, rng, move_set=move_set)
         if cand_e <= best_e_cpu:
             s = cand_s
             best_e_cpu = cand_e
     t3 = time.perf_counter()
 
-    print("Config:", f"N={N} B={B} steps={steps}")
+    print("Config:", f"N={N} B={B} steps={steps} moves={move_set}")
     print("GPU search:", f"time={t1-t0:.3f}s", f"bestE={best_e_gpu}")
     print("CPU search:", f"time={t3-t2:.3f}s", f"bestE={best_e_cpu}")
     if (t1 - t0) > 0:
@@ -92,5 +112,9 @@ def main():
     run_search(N=100, B=4096,  steps=30, seed=0)
     run_search(N=150, B=16384, steps=20, seed=0)
 
+    # Compound neighborhoods (same move set scored on GPU and CPU)
+    run_search(N=100, B=4096, steps=30, seed=0, move_set="1flip+2flip")
+    run_search(N=100, B=4096, steps=30, seed=0, move_set="kflip")
+
 if __name__ == "__main__":
     main()
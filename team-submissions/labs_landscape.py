@@ -0,0 +1,214 @@
+# labs_landscape.py
+# Exhaustive LABS energy landscape, computed once per N and cached on disk.
+#
+# Layout (one pair of .npy files per N inside the cache directory):
+#   labs_N{N}.npy         energies, energy_dtype(N) (uint16 for N <= MAX_N), length 2^N
+#   labs_N{N}_ground.npy  int64 indices of every ground state
+#
+# Index convention matches CUDA-Q bitstrings: qubit 0 is the leftmost
+# character, so index = int(bitstring, 2). Bits map to spins 0 -> +1, 1 -> -1
+# (same as qaoa_labs.bitstring_to_spins).
+#
+# Consumers map the arrays read-only (np.load(..., mmap_mode="r")), so the
+# landscape is shared zero-copy between processes after the first build.
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "LABS_LANDSCAPE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "landscape_cache"),
+)
+DEFAULT_CHUNK = 1 << 18
+MAX_N = 34
+
+
+# -----------------------------
+# Index <-> bitstring / spins
+# -----------------------------
+def bitstring_to_index(bitstring: str) -> int:
+    return int(bitstring, 2)
+
+
+def index_to_bitstring(index: int, N: int) -> str:
+    return format(int(index), f"0{N}b")
+
+
+def indices_to_spins(indices: np.ndarray, N: int) -> np.ndarray:
+    # indices: shape (B,) -> spins: shape (B, N), int8 entries +/-1
+    idx = np.asarray(indices, dtype=np.int64)
+    shifts = np.arange(N - 1, -1, -1, dtype=np.int64)
+    bits = (idx[:, None] >> shifts[None, :]) & 1
+    return (1 - 2 * bits).astype(np.int8)
+
+
+def max_energy(N: int) -> int:
+    # Worst case is the constant sequence: sum_k (N-k)^2
+    return (N - 1) * N * (2 * N - 1) // 6
+
+
+def energy_dtype(N: int) -> np.dtype:
+    # Stored dtype: uint16 up to N = 58, uint32 beyond (MAX_N keeps it uint16)
+    return np.dtype(np.uint16) if max_energy(N) <= np.iinfo(np.uint16).max else np.dtype(np.uint32)
+
+
+def landscape_paths(N: int, cache_dir: str = DEFAULT_CACHE_DIR) -> Tuple[str, str]:
+    energies = os.path.join(cache_dir, f"labs_N{N}.npy")
+    ground = os.path.join(cache_dir, f"labs_N{N}_ground.npy")
+    return energies, ground
+
+
+# -----------------------------
+# Chunked energy evaluation
+# -----------------------------
+def labs_energy_chunk(start: int, stop: int, N: int) -> np.ndarray:
+    # Spins laid out as (N, B) so every lag-k product is a contiguous row op.
+    # Accumulate in the smallest signed dtype that holds max_energy(N)
+    # (int16 up to N = 46), so raising MAX_N cannot overflow silently.
+    acc = np.min_scalar_type(-max_energy(N))
+    idx = np.arange(start, stop, dtype=np.int64)
+    shifts = np.arange(N - 1, -1, -1, dtype=np.int64)
+    S = (1 - 2 * ((idx[None, :] >> shifts[:, None]) & 1)).astype(acc)
+    E = np.zeros((stop - start,), dtype=acc)
+    for k in range(1, N):
+        ck = np.sum(S[: N - k] * S[k:], axis=0, dtype=acc)
+        E += ck * ck
+    return E
+
+
+def _fill_chunk(args):
+    # Worker: compute one chunk, write it into the shared memmap and
+    # report the chunk minimum plus the indices that attain it.
+    path, N, start, stop = args
+    E = labs_energy_chunk(start, stop, N)
+    out = np.load(path, mmap_mode="r+")
+    out[start:stop] = E
+    out.flush()
+    del out
+    e_min = int(E.min())
+    return e_min, np.flatnonzero(E == e_min) + start
+
+
+# -----------------------------
+# Build / load
+# -----------------------------
+def build_landscape(
+    N: int,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    workers: int = None,
+    chunk: int = DEFAULT_CHUNK,
+    verbose: bool = False,
+) -> Tuple[str, str]:
+    if not 1 <= N <= MAX_N:
+        raise ValueError(f"N must be in [1, {MAX_N}] for an exhaustive landscape, got {N}")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    e_path, g_path = landscape_paths(N, cache_dir)
+    tmp_path = e_path + f".tmp{os.getpid()}.npy"
+
+    size = 1 << N
+    out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=energy_dtype(N), shape=(size,))
+    del out
+
+    tasks = [(tmp_path, N, lo, min(lo + chunk, size)) for lo in range(0, size, chunk)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    t0 = time.perf_counter()
+    try:
+        if workers <= 1 or len(tasks) == 1:
+            results = [_fill_chunk(t) for t in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_fill_chunk, tasks))
+        t1 = time.perf_counter()
+
+        e_min = min(r[0] for r in results)
+        ground = np.concatenate([r[1] for r in results if r[0] == e_min]).astype(np.int64)
+
+        # Publish atomically so readers never see a half-written landscape
+        np.save(g_path, ground)
+        os.replace(tmp_path, e_path)
+    finally:
+        # Never leave a (possibly multi-GB) partial file behind on failure
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    if verbose:
+        print(f"[landscape] N={N}: 2^{N} states in {t1 - t0:.2f}s, "
+              f"E_min={e_min}, ground states={ground.size}")
+    return e_path, g_path
+
+
+def load_landscape(N: int, cache_dir: str = DEFAULT_CACHE_DIR) -> np.ndarray:
+    e_path, _ = landscape_paths(N, cache_dir)
+    return np.load(e_path, mmap_mode="r")
+
+
+def load_ground_states(N: int, cache_dir: str = DEFAULT_CACHE_DIR) -> np.ndarray:
+    _, g_path = landscape_paths(N, cache_dir)
+    return np.load(g_path)
+
+
+def get_landscape(
+    N: int,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    workers: int = None,
+    verbose: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    # Build on first use, then map the cached files.
+    e_path, g_path = landscape_paths(N, cache_dir)
+    if not (os.path.exists(e_path) and os.path.exists(g_path)):
+        build_landscape(N, cache_dir=cache_dir, workers=workers, verbose=verbose)
+    return load_landscape(N, cache_dir), load_ground_states(N, cache_dir)
+
+
+# -----------------------------
+# Landscape-based analyses
+# -----------------------------
+def ground_energy(N: int, cache_dir: str = DEFAULT_CACHE_DIR) -> int:
+    E, ground = get_landscape(N, cache_dir)
+    return int(E[ground[0]])
+
+
+def approx_ratio(N: int, energy: float, cache_dir: str = DEFAULT_CACHE_DIR) -> float:
+    # LABS is a minimisation problem: ratio = E_opt / E (1.0 is optimal)
+    e_opt = ground_energy(N, cache_dir)
+    return float(e_opt) / float(energy) if energy > 0 else 1.0
+
+
+def counts_energies(counts: dict, N: int, cache_dir: str = DEFAULT_CACHE_DIR) -> Tuple[np.ndarray, np.ndarray]:
+    # CUDA-Q counts {bitstring: freq} -> (energies, freqs) via landscape lookup
+    E, _ = get_landscape(N, cache_dir)
+    idx = np.fromiter((bitstring_to_index(b) for b in counts), dtype=np.int64, count=len(counts))
+    freqs = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+    return np.asarray(E[idx], dtype=np.int64), freqs
+
+
+def energy_histogram(N: int, cache_dir: str = DEFAULT_CACHE_DIR) -> Tuple[np.ndarray, np.ndarray]:
+    # (energy values, number of states at each energy)
+    E, _ = get_landscape(N, cache_dir)
+    hist = np.bincount(E)
+    values = np.flatnonzero(hist)
+    return values, hist[values]
+
+
+def main():
+    print(f"Cache dir: {DEFAULT_CACHE_DIR}")
+    header = f"{'N':>4} {'build (s)':>10} {'E_min':>7} {'#ground':>8} {'size (MB)':>10}"
+    print(header)
+    print("-" * len(header))
+    for N in range(4, 25, 2):
+        t0 = time.perf_counter()
+        E, ground = get_landscape(N)
+        t1 = time.perf_counter()
+        print(f"{N:>4} {t1 - t0:>10.3f} {int(E[ground[0]]):>7} {ground.size:>8} "
+              f"{E.nbytes / 2**20:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
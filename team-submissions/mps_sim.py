@@ -0,0 +1,419 @@
+# mps_sim.py
+# NumPy matrix-product-state simulator for the quantum-seeding kernels
+# (qaoa_kernel in qaoa_labs.py, trotterized_circuit_flat in the tutorial).
+#
+# Gate conventions follow CUDA-Q: rx(t) = exp(-i t X / 2), rz(t) = exp(-i t Z / 2),
+# qubit 0 is the leftmost character of a sampled bitstring.
+#
+# Memory is O(N chi^2), a gate spanning sites a..b costs O((b - a) chi^3) and
+# sampling costs O(N chi^2) per shot, so cost stays polynomial in N for a fixed
+# maximum bond dimension chi. Accuracy does not: the LABS Trotter states are
+# volume-law entangled, and at chi=16 the fidelity vs the exact state is
+# 0.90 at N=10, 0.41 at N=12 and 0.08 at N=14 (n_steps=2). Beyond that,
+# samples are close to random bitstrings. main() measures N <= 30. Larger N
+# runs, but it only gives useful seeds where the estimated fidelity stays
+# near 1.
+#
+# Truncation is reported two ways: truncation_error is the summed discarded
+# weight (unbounded, grows with the number of SVDs), and fidelity is the
+# product of (1 - eps_i) over all truncations. Each factor is the exact
+# fidelity of its gate; the product tracks the exact value at chi=16 above
+# (0.86 / 0.42 / 0.11 est.) but is optimistic under heavy truncation
+# (N=10, chi=4: 0.37 est. vs 0.18 exact).
+#
+# The CX ladder -> rz(theta) -> CX ladder blocks of Rzz / Rzzzz are applied as
+# one exact exp(-i theta/2 Z...Z) MPO of bond dimension 2 (zz_string), which
+# avoids swapping distant qubits next to each other for every CX.
+
+import os
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from multiflip import correlations_and_deltas, labs_energy_from_corr
+
+HALF_PI = 1.5707963267948966
+
+_H = np.array([[1, 1], [1, -1]], dtype=np.complex128) / np.sqrt(2.0)
+_X = np.array([[0, 1], [1, 0]], dtype=np.complex128)
+_CX = np.zeros((2, 2, 2, 2), dtype=np.complex128)    # (out_c, out_t, in_c, in_t)
+for _c in range(2):
+    for _t in range(2):
+        _CX[_c, _t ^ _c, _c, _t] = 1.0
+_SWAP = np.zeros((2, 2, 2, 2), dtype=np.complex128)
+for _a in range(2):
+    for _b in range(2):
+        _SWAP[_b, _a, _a, _b] = 1.0
+_Z_DIAG = np.array([1.0, -1.0])
+
+
+def _rx(theta: float) -> np.ndarray:
+    c, s = np.cos(theta / 2.0), np.sin(theta / 2.0)
+    return np.array([[c, -1j * s], [-1j * s, c]], dtype=np.complex128)
+
+
+def _rz(theta: float) -> np.ndarray:
+    return np.diag([np.exp(-0.5j * theta), np.exp(0.5j * theta)]).astype(np.complex128)
+
+
+# -----------------------------
+# MPS state
+# -----------------------------
+class MPS:
+    def __init__(self, N: int, max_bond: int = 64, cutoff: float = 1e-12):
+        # |0...0>, tensors indexed (left bond, physical, right bond)
+        self.N = N
+        self.max_bond = max_bond
+        self.cutoff = cutoff
+        self.tensors = []
+        for _ in range(N):
+            A = np.zeros((1, 2, 1), dtype=np.complex128)
+            A[0, 0, 0] = 1.0
+            self.tensors.append(A)
+        self.center = 0
+        self.truncation_error = 0.0
+        self.fidelity = 1.0
+        self.max_bond_used = 1
+
+    # ---- canonical form ----
+    def _move_center(self, p: int):
+        A = self.tensors
+        while self.center < p:
+            i = self.center
+            l, d, r = A[i].shape
+            Q, R = np.linalg.qr(A[i].reshape(l * d, r))
+            A[i] = Q.reshape(l, d, -1)
+            A[i + 1] = np.tensordot(R, A[i + 1], axes=(1, 0))
+            self.center += 1
+        while self.center > p:
+            i = self.center
+            l, d, r = A[i].shape
+            Q, R = np.linalg.qr(A[i].reshape(l, d * r).T)
+            A[i] = Q.T.reshape(-1, d, r)
+            A[i - 1] = np.tensordot(A[i - 1], R.T, axes=(2, 0))
+            self.center -= 1
+
+    def _truncated_svd(self, M: np.ndarray):
+        try:
+            U, S, Vh = np.linalg.svd(M, full_matrices=False)
+        except np.linalg.LinAlgError:
+            # gesdd occasionally fails on well-conditioned input; SVD of R
+            # from a QR factorisation converges in those cases
+            Q, R = np.linalg.qr(M)
+            U, S, Vh = np.linalg.svd(R, full_matrices=False)
+            U = Q @ U
+        w = S * S
+        total = w.sum()
+        # Smallest chi whose discarded weight stays under the cutoff
+        tail = np.cumsum(w[::-1])[::-1] / total
+        keep = max(1, int(np.sum(tail > self.cutoff)))
+        chi = min(keep, self.max_bond)
+        eps = float(w[chi:].sum() / total)
+        self.truncation_error += eps
+        self.fidelity *= 1.0 - eps
+        S = S[:chi] / np.sqrt(w[:chi].sum())
+        self.max_bond_used = max(self.max_bond_used, chi)
+        return U[:, :chi], S, Vh[:chi]
+
+    def _split(self, theta: np.ndarray, p: int):
+        # theta: (l, 2, 2, r) on sites p, p+1 -> center ends at p+1
+        l, _, _, r = theta.shape
+        U, S, Vh = self._truncated_svd(theta.reshape(l * 2, 2 * r))
+        self.tensors[p] = U.reshape(l, 2, -1)
+        self.tensors[p + 1] = (S[:, None] * Vh).reshape(-1, 2, r)
+        self.center = p + 1
+
+    # ---- gates ----
+    def apply_1q(self, U: np.ndarray, q: int):
+        self.tensors[q] = np.einsum("ij,ajb->aib", U, self.tensors[q])
+
+    def apply_2q_adjacent(self, G: np.ndarray, p: int):
+        # G: (out_p, out_p+1, in_p, in_p+1) on sites p, p+1
+        self._move_center(p)
+        theta = np.einsum("aib,bjc->aijc", self.tensors[p], self.tensors[p + 1])
+        theta = np.einsum("ijkl,aklc->aijc", G, theta)
+        self._split(theta, p)
+
+    def h(self, q: int):
+        self.apply_1q(_H, q)
+
+    def x(self, q: int):
+        self.apply_1q(_X, q)
+
+    def rx(self, theta: float, q: int):
+        self.apply_1q(_rx(theta), q)
+
+    def rz(self, theta: float, q: int):
+        self.apply_1q(_rz(theta), q)
+
+    def cx(self, control: int, target: int):
+        # Swap the target next to the control, apply, swap back
+        if control == target:
+            raise ValueError("cx needs two distinct qubits")
+        step = 1 if target > control else -1
+        t = target
+        while abs(t - control) > 1:
+            self.apply_2q_adjacent(_SWAP, min(t, t - step))
+            t -= step
+        if t > control:
+            self.apply_2q_adjacent(_CX, control)
+        else:
+            self.apply_2q_adjacent(_CX.transpose(1, 0, 3, 2), t)
+        while t != target:
+            t += step
+            self.apply_2q_adjacent(_SWAP, min(t, t - step))
+
+    def zz_string(self, theta: float, qubits):
+        # exp(-i theta/2 Z_q0 Z_q1 ... ) == CX ladder onto the last qubit,
+        # rz(theta) on it, reversed ladder. Applied as a bond-2 MPO:
+        # cos(theta/2) I - i sin(theta/2) Z...Z, then compressed by SVD.
+        qs = sorted(set(int(q) for q in qubits))
+        if len(qs) != len(qubits):
+            raise ValueError("zz_string needs distinct qubits")
+        if len(qs) == 1:
+            self.rz(theta, qs[0])
+            return
+        c, s = np.cos(theta / 2.0), np.sin(theta / 2.0)
+        if abs(s) < 1e-15:
+            # Identity to machine precision (e.g. the last Trotter step,
+            # where compute_theta is ~1e-18)
+            return
+        a, b = qs[0], qs[-1]
+        self._move_center(a)
+        A = self.tensors
+
+        # First site carries the two MPO branches
+        T = A[a]
+        l, _, r = T.shape
+        w = np.stack([np.full(2, c, dtype=np.complex128), -1j * s * _Z_DIAG])   # (m, i)
+        A[a] = np.einsum("aib,mi->aibm", T, w).reshape(l, 2, 2 * r)   # (r, m)
+        for p in range(a + 1, b):
+            T = A[p]
+            l, _, r = T.shape
+            z = _Z_DIAG if p in qs else np.ones(2)
+            W = np.zeros((l, 2, 2, r, 2), dtype=np.complex128)   # (l, m, i, r, m)
+            W[:, 0, :, :, 0] = T
+            W[:, 1, :, :, 1] = T * z[None, :, None]
+            A[p] = W.reshape(2 * l, 2, 2 * r)
+        T = A[b]
+        l, _, r = T.shape
+        W = np.stack([T, T * _Z_DIAG[None, :, None]], axis=1)     # (l, m, i, r)
+        A[b] = W.reshape(2 * l, 2, r)
+
+        # Site b's I and Z branches share its right bond, so a+1..b are no
+        # longer right-isometric. QR right-to-left back to a first, so the
+        # truncating left-to-right SVD sweep sees the true Schmidt spectra.
+        for p in range(b, a, -1):
+            l, d, r = A[p].shape
+            Q, R = np.linalg.qr(A[p].reshape(l, d * r).T)
+            A[p] = Q.T.reshape(-1, d, r)
+            A[p - 1] = np.tensordot(A[p - 1], R.T, axes=(2, 0))
+        for p in range(a, b):
+            l, d, r = A[p].shape
+            U, S, Vh = self._truncated_svd(A[p].reshape(l * d, r))
+            A[p] = U.reshape(l, d, -1)
+            A[p + 1] = np.tensordot(S[:, None] * Vh, A[p + 1], axes=(1, 0))
+        self.center = b
+
+    # ---- readout ----
+    def bond_dims(self) -> List[int]:
+        return [T.shape[2] for T in self.tensors[:-1]]
+
+    def to_statevector(self) -> np.ndarray:
+        # Dense 2^N vector (small N only), qubit 0 = most significant bit
+        psi = self.tensors[0]
+        for T in self.tensors[1:]:
+            psi = np.tensordot(psi, T, axes=(psi.ndim - 1, 0))
+        return psi.reshape(-1)
+
+    def sample(self, shots: int, seed=None) -> np.ndarray:
+        # Direct sampling, all shots at once: (shots, N) array of 0/1 bits.
+        # With the center at site 0 every later tensor is right-isometric,
+        # so conditional probabilities come from the left environment only.
+        rng = np.random.default_rng(seed)
+        self._move_center(0)
+        bits = np.zeros((shots, self.N), dtype=np.int8)
+        env = np.ones((shots, 1), dtype=np.complex128)
+        for p, T in enumerate(self.tensors):
+            v = np.einsum("sa,aib->sib", env, T)
+            w = np.sum(np.abs(v) ** 2, axis=2)
+            p1 = w[:, 1] / w.sum(axis=1)
+            b = (rng.random(shots) < p1).astype(np.int8)
+            bits[:, p] = b
+            env = v[np.arange(shots), b] / np.sqrt(w[np.arange(shots), b])[:, None]
+        return bits
+
+    def mz(self, shots: int, seed=None) -> Dict[str, int]:
+        # CUDA-Q style counts {bitstring: freq}
+        bits = self.sample(shots, seed)
+        chars = np.where(bits == 1, "1", "0")
+        return dict(Counter("".join(row) for row in chars))
+
+
+# -----------------------------
+# Kernel replays (same gate sequence as the CUDA-Q kernels)
+# -----------------------------
+def Rzz(m: MPS, theta: float, q0: int, q1: int):
+    m.zz_string(theta, [q0, q1])
+
+
+def Rzzzz(m: MPS, theta: float, q0: int, q1: int, q2: int, q3: int):
+    m.zz_string(theta, [q0, q1, q2, q3])
+
+
+def R_yz(m: MPS, theta: float, q0: int, q1: int):
+    m.rx(HALF_PI, q0)
+    Rzz(m, theta, q0, q1)
+    m.rx(-HALF_PI, q0)
+
+
+def R_zy(m: MPS, theta: float, q0: int, q1: int):
+    m.rx(HALF_PI, q1)
+    Rzz(m, theta, q0, q1)
+    m.rx(-HALF_PI, q1)
+
+
+def _R_pauli4(m: MPS, theta: float, quad, y_pos: int):
+    m.rx(HALF_PI, quad[y_pos])
+    Rzzzz(m, theta, *quad)
+    m.rx(-HALF_PI, quad[y_pos])
+
+
+def trotterized_circuit_flat_mps(
+    N: int,
+    G2_flat,
+    G4_flat,
+    steps: int,
+    dt: float,
+    T: float,
+    thetas,
+    max_bond: int = 64,
+    cutoff: float = 1e-12,
+) -> MPS:
+    # Same arguments as trotterized_circuit_flat (plus MPS settings)
+    m = MPS(N, max_bond=max_bond, cutoff=cutoff)
+    for q in range(N):
+        m.h(q)
+
+    G2 = np.asarray(G2_flat, dtype=int).reshape(-1, 2)
+    G4 = np.asarray(G4_flat, dtype=int).reshape(-1, 4)
+    for n in range(steps):
+        theta = thetas[n]
+        for i, j in G2:
+            R_yz(m, 4.0 * theta, i, j)
+            R_zy(m, 4.0 * theta, i, j)
+        for quad in G4:
+            for y_pos in range(4):
+                _R_pauli4(m, 8.0 * theta, quad, y_pos)
+    return m
+
+
+def qaoa_kernel_mps(N: int, gamma: float, beta: float, max_bond: int = 64, cutoff: float = 1e-12) -> MPS:
+    # Same circuit as qaoa_labs.qaoa_kernel
+    m = MPS(N, max_bond=max_bond, cutoff=cutoff)
+    for i in range(N):
+        m.h(i)
+    for i in range(N):
+        for j in range(i + 1, N):
+            m.zz_string(2.0 * gamma, [i, j])    # cx(i,j); rz(2*gamma, j); cx(i,j)
+    for i in range(N):
+        m.rx(2.0 * beta, i)
+    return m
+
+
+# -----------------------------
+# Seeding helpers (mirror exercise6)
+# get_interactions / flatten_G2 / flatten_G4 are copies of the exercise6
+# builders in the tutorial notebook (not importable as a module): keep in sync
+# -----------------------------
+def get_interactions(N):
+    G2 = []
+    G4 = []
+
+    for i in range(0, N - 2):
+        k_max = (N - (i + 1)) // 2
+        for k in range(1, k_max + 1):
+            G2.append([i, i + k])
+
+    for i in range(0, N - 3):
+        t_max = (N - i - 2) // 2
+        for t in range(1, t_max + 1):
+            k_max = N - i - t - 1
+            for k in range(t + 1, k_max + 1):
+                G4.append([i, i + t, i + k, i + k + t])
+
+    return G2, G4
+
+
+def flatten_G2(G2):
+    return [x for pair in G2 for x in pair]
+
+
+def flatten_G4(G4):
+    return [x for quad in G4 for x in quad]
+
+
+def _labs_utils():
+    aux = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tutorial_notebook")
+    if aux not in sys.path:
+        sys.path.append(aux)
+    import auxiliary_files.labs_utils as utils
+    return utils
+
+
+def mps_seed_counts(
+    N: int,
+    shots: int = 50,
+    T: float = 1.0,
+    n_steps: int = 1,
+    max_bond: int = 32,
+    cutoff: float = 1e-12,
+    seed=None,
+) -> Tuple[Dict[str, int], Dict[str, float]]:
+    # Drop-in for the cudaq.sample step of exercise6: returns (counts, info),
+    # counts can go straight into counts_to_spin_population.
+    # info["fidelity"] estimates the overlap with the exact state; reject
+    # seeds when it is far from 1 (they are then close to random bitstrings)
+    utils = _labs_utils()
+    G2, G4 = get_interactions(N)
+    dt = T / n_steps
+    thetas = [utils.compute_theta(step * dt, dt, T, N, G2, G4) for step in range(1, n_steps + 1)]
+
+    t0 = time.perf_counter()
+    m = trotterized_circuit_flat_mps(
+        N, flatten_G2(G2), flatten_G4(G4), n_steps, dt, T, thetas,
+        max_bond=max_bond, cutoff=cutoff,
+    )
+    t1 = time.perf_counter()
+    counts = m.mz(shots, seed=seed)
+    t2 = time.perf_counter()
+
+    info = {
+        "truncation_error": m.truncation_error,
+        "fidelity": m.fidelity,
+        "max_bond_used": m.max_bond_used,
+        "circuit_time_s": t1 - t0,
+        "sample_time_per_shot_s": (t2 - t1) / shots,
+    }
+    return counts, info
+
+
+def main():
+    header = (f"{'N':>4} {'chi':>4} {'used':>5} {'trunc err':>10} {'fidelity':>9} "
+              f"{'circuit (s)':>12} {'s/shot':>10} {'best E':>7}")
+    print(header)
+    print("-" * len(header))
+    # n_steps=2: with T=1 the last Trotter step has theta ~ 0 (see compute_theta)
+    for N, chi in [(10, 16), (12, 16), (12, 64), (14, 16), (20, 16), (30, 16)]:
+        counts, info = mps_seed_counts(N, shots=200, n_steps=2, max_bond=chi, seed=0)
+        spins = [np.array([1 if ch == "1" else -1 for ch in b]) for b in counts]
+        best_E = min(labs_energy_from_corr(correlations_and_deltas(x)[0]) for x in spins)
+        print(f"{N:>4} {chi:>4} {info['max_bond_used']:>5} {info['truncation_error']:>10.2e} {info['fidelity']:>9.2e} "
+              f"{info['circuit_time_s']:>12.2f} {info['sample_time_per_shot_s']:>10.2e} {best_E:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# multiflip.py
+# Compound (multi-flip) LABS neighborhoods scored from the correlation vector.
+#
+# For spins s and lags k = 1..N-1 let C_k = sum_i s_i s_{i+k}, E = sum_k C_k^2.
+# Flipping bit j changes C_k by
+#     D[j, k] = -2 s_j (s_{j+k} + s_{j-k})        (out-of-range terms are 0)
+# Flipping a set F changes C_k by sum_{j in F} D[j, k], except that every pair
+# (a, b) in F with |a - b| = k is counted twice there but really unchanged:
+# add back 4 s_a s_b. That gives, with E1[a] the 1-flip energies,
+#     E2[a, b] = E1[a] + E1[b] - E + 2 (D D^T)[a, b] + 8 p X + 16
+# where p = s_a s_b and X = C_d + D[a, d] + D[b, d] at d = |a - b|.
+# All O(N^2) pair energies come from one matmul, no neighbor arrays needed.
+#
+# Every function works on NumPy or CuPy inputs (array module picked from s).
+
+import time
+from collections import deque
+
+import numpy as np
+
+try:
+    import cupy as cp
+except Exception:
+    cp = None
+
+MOVE_SETS = ("1flip", "2flip", "1flip+2flip", "kflip")
+
+
+def get_xp(a):
+    return cp.get_array_module(a) if cp is not None else np
+
+
+# -----------------------------
+# Correlation vector + flip deltas
+# -----------------------------
+def correlations_and_deltas(s):
+    # s: shape (N,), entries +/-1 -> C: (N-1,), D: (N, N-1)
+    xp = get_xp(s)
+    s = s.astype(xp.int64, copy=False)
+    N = s.shape[0]
+    sp = xp.concatenate([xp.zeros(N, dtype=xp.int64), s, xp.zeros(N, dtype=xp.int64)])
+    j = xp.arange(N)[:, None]
+    k = xp.arange(1, N)[None, :]
+    right = sp[N + j + k]            # s_{j+k}
+    left = sp[N + j - k]             # s_{j-k}
+    C = xp.sum(s[:, None] * right, axis=0)
+    D = -2 * s[:, None] * (right + left)
+    return C, D
+
+
+def labs_energy_from_corr(C):
+    xp = get_xp(C)
+    return int(xp.sum(C * C))
+
+
+# -----------------------------
+# Move scoring
+# -----------------------------
+def score_1flip(s, C=None, D=None):
+    # Energies after flipping each single bit: shape (N,)
+    if C is None or D is None:
+        C, D = correlations_and_deltas(s)
+    V = C[None, :] + D
+    return (V * V).sum(axis=1)
+
+
+def score_2flip(s, C=None, D=None):
+    # Energies after flipping every pair a < b: (a_idx, b_idx, energies)
+    xp = get_xp(s)
+    if C is None or D is None:
+        C, D = correlations_and_deltas(s)
+    s = s.astype(xp.int64, copy=False)
+    N = s.shape[0]
+
+    E0 = int((C * C).sum())
+    E1 = score_1flip(s, C, D)
+    a, b = xp.triu_indices(N, k=1)
+    Df = D.astype(xp.float64)
+    cross = (Df @ Df.T)[a, b]
+    d = b - a - 1                    # column of lag |a - b|
+    X = C[d] + D[a, d] + D[b, d]
+    p = s[a] * s[b]
+    E2 = E1[a] + E1[b] - E0 + xp.rint(2.0 * cross).astype(xp.int64) + 8 * p * X + 16
+    return a, b, E2
+
+
+def sample_kflip_moves(N, k, n_moves, rng, xp=np):
+    # n_moves rows of k distinct bit indices
+    if not 1 <= k <= N:
+        raise ValueError(f"k must be in [1, N={N}], got {k}")
+    flips = np.argsort(rng.random((n_moves, N)), axis=1)[:, :k]
+    return xp.asarray(flips)
+
+
+def score_kflip(s, flips, C=None, D=None):
+    # flips: shape (M, k) distinct indices per row -> energies: shape (M,)
+    xp = get_xp(s)
+    if C is None or D is None:
+        C, D = correlations_and_deltas(s)
+    s = s.astype(xp.int64, copy=False)
+    M, k = flips.shape
+    rows = xp.arange(M)
+
+    V = C[None, :] + D[flips].sum(axis=1)
+    for u in range(k):
+        for v in range(u + 1, k):
+            a = flips[:, u]
+            b = flips[:, v]
+            V[rows, xp.abs(a - b) - 1] += 4 * s[a] * s[b]
+    return (V * V).sum(axis=1)
+
+
+def neighborhood(s, move_set="1flip", k=3, n_samples=None, rng=None):
+    # Score a whole move set at once.
+    # Returns (moves, energies): moves is (M, w) bit indices, -1 = padding.
+    xp = get_xp(s)
+    N = s.shape[0]
+    C, D = correlations_and_deltas(s)
+
+    if move_set == "1flip":
+        return xp.arange(N)[:, None], score_1flip(s, C, D)
+    if move_set == "2flip":
+        a, b, E2 = score_2flip(s, C, D)
+        return xp.stack([a, b], axis=1), E2
+    if move_set == "1flip+2flip":
+        a, b, E2 = score_2flip(s, C, D)
+        m1 = xp.stack([xp.arange(N), xp.full(N, -1)], axis=1)
+        m2 = xp.stack([a, b], axis=1)
+        return xp.concatenate([m1, m2]), xp.concatenate([score_1flip(s, C, D), E2])
+    if move_set == "kflip":
+        if rng is None:
+            rng = np.random.default_rng()
+        if n_samples is None:
+            n_samples = N * (N - 1) // 2
+        flips = sample_kflip_moves(N, k, n_samples, rng, xp)
+        return flips, score_kflip(s, flips, C, D)
+    raise ValueError(f"Unknown move_set '{move_set}' (expected one of {MOVE_SETS})")
+
+
+def apply_move(s, move):
+    t = s.copy()
+    move = move[move >= 0]
+    t[move] *= -1
+    return t
+
+
+# -----------------------------
+# Tabu Search with selectable move sets
+# -----------------------------
+def tabu_search(start, iters=200, tabu_tenure=15, rng=None, move_set="1flip", k=3, n_samples=None):
+    # Same contract as the notebook tabu_search: returns (best, best_e).
+    # The deque holds one entry per iteration (the bits of that move), so
+    # tabu_tenure counts iterations for every move set. A move is tabu if
+    # any bit it flips is tabu; aspiration on new best.
+    if rng is None:
+        rng = np.random.default_rng()
+
+    xp = get_xp(start)
+    s = start.copy()
+    best = s.copy()
+    C, _ = correlations_and_deltas(s)
+    best_e = float(labs_energy_from_corr(C))
+    tabu = deque(maxlen=tabu_tenure)
+    N = s.shape[0]
+
+    for _ in range(iters):
+        moves, E = neighborhood(s, move_set, k=k, n_samples=n_samples, rng=rng)
+
+        tabu_mask = xp.zeros(N + 1, dtype=bool)   # slot N absorbs -1 padding
+        if tabu:
+            tabu_mask[xp.asarray([bit for bits in tabu for bit in bits])] = True
+        is_tabu = tabu_mask[moves].any(axis=1)
+        allowed = (~is_tabu) | (E < best_e)
+
+        if bool(allowed.any()):
+            i = int(xp.argmin(xp.where(allowed, E, xp.iinfo(xp.int64).max)))
+        else:
+            i = int(xp.argmin(E))
+
+        move = moves[i]
+        s = apply_move(s, move)
+        cur_e = float(E[i])
+        tabu.append(tuple(int(bit) for bit in move[move >= 0].tolist()))
+
+        if cur_e < best_e:
+            best = s.copy()
+            best_e = cur_e
+
+    return best, best_e
+
+
+# -----------------------------
+# Benchmarks
+# -----------------------------
+def labs_energy_batch(spins_batch):
+    xp = get_xp(spins_batch)
+    S = spins_batch.astype(xp.int32, copy=False)
+    B, N = S.shape
+    E = xp.zeros((B,), dtype=xp.int64)
+    for k in range(1, N):
+        ck = xp.sum(S[:, : N - k] * S[:, k:], axis=1, dtype=xp.int64)
+        E += ck * ck
+    return E
+
+
+def bench_evals_per_s(N, move_set, iters=20, seed=0, k=3):
+    rng = np.random.default_rng(seed)
+    s = rng.choice([-1, 1], size=(N,)).astype(np.int32)
+    moves, _ = neighborhood(s, move_set, k=k, rng=rng)
+    n_moves = moves.shape[0]
+
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        neighborhood(s, move_set, k=k, rng=rng)
+    t_corr = (time.perf_counter() - t0) / iters
+
+    # Baseline: materialise the same neighbors and evaluate from scratch
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        neigh = np.tile(s[None, :], (n_moves, 1))
+        rows = np.arange(n_moves)
+        for col in moves.T:
+            sel = col >= 0
+            neigh[rows[sel], col[sel]] *= -1
+        labs_energy_batch(neigh)
+    t_naive = (time.perf_counter() - t0) / iters
+    return n_moves, n_moves / t_corr, n_moves / t_naive
+
+
+def time_to_target(N, target, move_set, runs=5, iters=200, max_restarts=50, seed=0):
+    # Mean wall time of restarted tabu searches until E <= target
+    times, hits = [], 0
+    for r in range(runs):
+        rng = np.random.default_rng(seed + r)
+        t0 = time.perf_counter()
+        for _ in range(max_restarts):
+            s0 = rng.choice([-1, 1], size=(N,)).astype(np.int32)
+            _, e = tabu_search(s0, iters=iters, rng=rng, move_set=move_set)
+            if e <= target:
+                hits += 1
+                break
+        times.append(time.perf_counter() - t0)
+    return float(np.mean(times)), hits
+
+
+def main():
+    print("Evaluations/s (correlation-vector scoring vs building neighbor arrays)")
+    header = f"{'N':>5} {'moves':>12} {'#moves':>8} {'evals/s':>12} {'naive/s':>12}"
+    print(header)
+    print("-" * len(header))
+    for N in [32, 64, 100]:
+        for move_set in MOVE_SETS:
+            n, fast, naive = bench_evals_per_s(N, move_set)
+            print(f"{N:>5} {move_set:>12} {n:>8} {fast:>12.3e} {naive:>12.3e}")
+
+    print()
+    print("Time-to-target (target = exhaustive ground energy)")
+    try:
+        from labs_landscape import ground_energy
+    except Exception as e:
+        print("Could not load labs_landscape:", e)
+        return
+    header = f"{'N':>5} {'target':>7} {'moves':>12} {'mean t (s)':>11} {'hits':>6}"
+    print(header)
+    print("-" * len(header))
+    for N in [16, 20]:
+        target = ground_energy(N)
+        for move_set in ("1flip", "2flip", "1flip+2flip"):
+            t, hits = time_to_target(N, target, move_set)
+            print(f"{N:>5} {target:>7} {move_set:>12} {t:>11.3f} {hits:>6}")
+
+
+if __name__ == "__main__":
+    main()
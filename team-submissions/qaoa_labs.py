@@ -6,6 +6,8 @@ import itertools
 import numpy as np
 import cudaq
 
+from labs_landscape import DEFAULT_CACHE_DIR, get_landscape, counts_energies, index_to_bitstring
+
 
 # -------------------------
 # LABS energy (classical)
@@ -101,6 +103,135 @@ def qaoa_sample(
     return best
 
 
+# -------------------------
+# Batched evaluation over the (gamma, beta) grid
+# -------------------------
+def zz_phase_diagonal(N: int):
+    # sum_{i<j} z_i z_j for every basis state (CUDA-Q order, 0 -> +1).
+    # Only depends on the magnetisation M: (M^2 - N) / 2
+    idx = np.arange(1 << N, dtype=np.int64)
+    popcount = np.zeros_like(idx)
+    for q in range(N):
+        popcount += (idx >> q) & 1
+    M = N - 2 * popcount
+    return ((M * M - N) // 2).astype(np.float64)
+
+
+def qaoa_statevectors(N: int, gammas, betas, zz_diag=None):
+    # Stacked statevectors of qaoa_kernel, shape (P, 2^N), one row per
+    # (gamma[p], beta[p]). Qubit 0 is the most significant index bit.
+    gammas = np.asarray(gammas, dtype=np.float64)
+    betas = np.asarray(betas, dtype=np.float64)
+    if zz_diag is None:
+        zz_diag = zz_phase_diagonal(N)
+    P = gammas.size
+
+    # h^N, then exp(-i*gamma*Z_i Z_j) for all pairs (the CX-RZ-CX blocks)
+    psi = np.exp(-1j * gammas[:, None] * zz_diag[None, :]) / np.sqrt(1 << N)
+
+    # Mixer rx(2*beta) = [[c, -is], [-is, c]] on every qubit
+    c = np.cos(betas)[:, None, None]
+    ms = -1j * np.sin(betas)[:, None, None]
+    for q in range(N):
+        v = psi.reshape(P, 1 << q, 2, 1 << (N - q - 1))
+        a0 = v[:, :, 0, :].copy()
+        a1 = v[:, :, 1, :]
+        v[:, :, 0, :] = c * a0 + ms * a1
+        v[:, :, 1, :] = ms * a0 + c * a1
+    return psi
+
+
+def _counts_from_indices(hist: np.ndarray, N: int):
+    nz = np.flatnonzero(hist)
+    return {index_to_bitstring(i, N): int(hist[i]) for i in nz}
+
+
+def qaoa_sample_batched(
+    N: int,
+    shots: int = 300,
+    gammas=(0.3, 0.7, 1.1),
+    betas=(0.3, 0.7, 1.1),
+    method: str = "statevector",
+    batch_size: int = None,
+    seed: int = None,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+):
+    # Same grid as qaoa_sample, evaluated in batches.
+    #   method="statevector": local NumPy simulation of stacked statevectors,
+    #                         "expectation" is the exact <E>, shots drawn per point
+    #   method="async":       cudaq.sample_async for every point up front,
+    #                         spread round-robin over the target's QPUs, then
+    #                         collect. "expectation" is the sample mean of E.
+    #                         Calls only overlap on a multi-QPU target, e.g.
+    #                         cudaq.set_target("nvidia", option="mqpu")
+    # LABS energies come from the cached landscape (labs_landscape.py), mapped
+    # read-only from cache_dir and never copied whole into RAM.
+    grid = np.array([(g, b) for g in gammas for b in betas], dtype=np.float64)
+    P = grid.shape[0]
+    E, _ = get_landscape(N, cache_dir)
+
+    expectation = np.zeros((P,), dtype=np.float64)
+    point_best = np.zeros((P,), dtype=np.int64)
+    point_best_idx = np.zeros((P,), dtype=np.int64)
+    counts = [None] * P
+
+    if method == "statevector":
+        rng = np.random.default_rng(seed)
+        zz_diag = zz_phase_diagonal(N)
+        if batch_size is None:
+            # Keep each stacked block around 256 MB of complex128
+            batch_size = max(1, (256 << 20) // (16 << N))
+
+        for lo in range(0, P, batch_size):
+            hi = min(lo + batch_size, P)
+            psi = qaoa_statevectors(N, grid[lo:hi, 0], grid[lo:hi, 1], zz_diag)
+            probs = np.abs(psi) ** 2
+            probs /= probs.sum(axis=1, keepdims=True)
+            # <E> over slices of the memmap: only one slice is cast to float64
+            for s0 in range(0, E.size, 1 << 20):
+                s1 = min(s0 + (1 << 20), E.size)
+                expectation[lo:hi] += probs[:, s0:s1] @ E[s0:s1].astype(np.float64)
+
+            hists = rng.multinomial(shots, probs)
+            for p in range(hi - lo):
+                nz = np.flatnonzero(hists[p])
+                j = nz[np.argmin(E[nz])]
+                point_best_idx[lo + p] = j
+                point_best[lo + p] = int(E[j])
+                counts[lo + p] = _counts_from_indices(hists[p], N)
+
+    elif method == "async":
+        num_qpus = cudaq.get_target().num_qpus()
+        futures = [
+            cudaq.sample_async(qaoa_kernel, N, float(g), float(b), shots_count=shots, qpu_id=p % num_qpus)
+            for p, (g, b) in enumerate(grid)
+        ]
+        for p, fut in enumerate(futures):
+            counts[p] = {k: int(v) for k, v in fut.get().items()}
+            energies, freqs = counts_energies(counts[p], N, cache_dir)
+            expectation[p] = float(energies @ freqs) / float(freqs.sum())
+            j = int(np.argmin(energies))
+            point_best[p] = int(energies[j])
+            point_best_idx[p] = int(list(counts[p])[j], 2)
+
+    else:
+        raise ValueError(f"Unknown method '{method}' (expected 'statevector' or 'async')")
+
+    p_best = int(np.argmin(point_best))
+    best_bitstring = index_to_bitstring(point_best_idx[p_best], N)
+    return {
+        "gammas": grid[:, 0],
+        "betas": grid[:, 1],
+        "expectation": expectation,
+        "point_best_energy": point_best,
+        "counts": counts,
+        "best_energy": int(point_best[p_best]),
+        "best_spins": bitstring_to_spins(best_bitstring),
+        "best_params": (float(grid[p_best, 0]), float(grid[p_best, 1])),
+        "best_bitstring": best_bitstring,
+    }
+
+
 def try_set_target(name: str):
     try:
         cudaq.set_target(name)
@@ -126,3 +257,11 @@ if __name__ == "__main__":
     for N in [8, 10, 12]:
         q = qaoa_sample(N, shots=500, gammas=(0.2, 0.6, 1.0), betas=(0.2, 0.6, 1.0))
         print(f"N={N} | best found E={q['best_energy']} | params={q['best_params']}")
+
+    # Batched grid sweep: all points in one stacked statevector evaluation
+    grid = np.linspace(0.1, 1.5, 8)
+    for N in [8, 10, 12]:
+        qb = qaoa_sample_batched(N, shots=500, gammas=grid, betas=grid, seed=0)
+        p = int(np.argmin(qb["expectation"]))
+        print(f"N={N} | batched best E={qb['best_energy']} | params={qb['best_params']} | "
+              f"min <E>={qb['expectation'][p]:.2f} at {(qb['gammas'][p], qb['betas'][p])}")
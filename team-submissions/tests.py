@@ -9,6 +9,7 @@ What this does:
 - Checks physical invariances (spin-flip symmetry)
 - Confirms brute-force best is consistent
 - Smoke-tests QAOA sampling for small N (fast)
+- Checks the cached exhaustive energy landscape against the reference
 - Prints a clear PASS/FAIL summary
 
 Notes:
@@ -16,8 +17,10 @@ Notes:
 - If CUDA-Q is not available in the environment, QAOA tests will be skipped.
 """
 
+import itertools
 import math
 import random
+import tempfile
 import traceback
 
 # ----------------------------
@@ -76,6 +79,30 @@ def import_student():
         raise TestFailure(f"Could not import qaoa_labs.py: {e}")
 
 
+def import_multiflip():
+    try:
+        import multiflip
+        return multiflip
+    except Exception as e:
+        raise TestFailure(f"Could not import multiflip.py: {e}")
+
+
+def import_mps():
+    try:
+        import mps_sim
+        return mps_sim
+    except Exception as e:
+        raise TestFailure(f"Could not import mps_sim.py: {e}")
+
+
+def import_landscape():
+    try:
+        import labs_landscape as landscape
+        return landscape
+    except Exception as e:
+        raise TestFailure(f"Could not import labs_landscape.py: {e}")
+
+
 # ----------------------------
 # Tests
 # ----------------------------
@@ -165,6 +192,230 @@ def test_qaoa_smoketest_smallN_fast():
         check(best_e == labs_energy(best_spins), "Reported best_energy must match labs_energy(best_spins)")
 
 
+def test_qaoa_batched_smallN():
+    student = import_student()
+    check(hasattr(student, "qaoa_sample_batched"), "qaoa_labs.py must define qaoa_sample_batched(N, ...)")
+    labs_energy = student.labs_energy
+
+    try:
+        import cudaq  # noqa: F401
+    except Exception:
+        print("[SKIP] Batched QAOA test: cudaq not available in this environment")
+        return
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for N in [3, 4, 5, 6]:
+            res = student.qaoa_sample_batched(
+                N, shots=200, gammas=(0.0, 0.5), betas=(0.0, 0.5), seed=N, cache_dir=cache_dir
+            )
+            check(len(res["expectation"]) == 4, "qaoa_sample_batched must return one entry per grid point")
+            check(all(sum(c.values()) == 200 for c in res["counts"]), "Each grid point must draw exactly `shots` samples")
+
+            # gamma = beta = 0 leaves |+>^N: <E> is the mean over all bitstrings
+            mean_E = sum(ref_labs_energy(list(p)) for p in itertools.product([-1, 1], repeat=N)) / 2 ** N
+            check(abs(res["expectation"][0] - mean_E) < 1e-9, f"<E> at gamma=beta=0 must be {mean_E} for N={N}")
+
+            check(len(res["best_spins"]) == N, f"best_spins length must be N={N}")
+            check(res["best_energy"] == labs_energy(res["best_spins"]), "Reported best_energy must match labs_energy(best_spins)")
+            check(res["best_energy"] == min(res["point_best_energy"]), "best_energy must be the minimum over grid points")
+
+
+def test_multiflip_scores_match_reference():
+    multiflip = import_multiflip()
+    import numpy as np
+
+    rng = np.random.default_rng(3)
+    for N in range(3, 16):
+        s = rng.choice([-1, 1], size=N).astype(np.int32)
+        for move_set in multiflip.MOVE_SETS:
+            moves, energies = multiflip.neighborhood(s, move_set, k=3, n_samples=40, rng=rng)
+            for move, e in zip(moves, energies):
+                t = multiflip.apply_move(s, move)
+                e_ref = ref_labs_energy(t.tolist())
+                check(int(e) == e_ref, f"{move_set} energy mismatch for N={N}, move {move.tolist()}: {int(e)} != {e_ref}")
+
+        n_pairs = len(multiflip.neighborhood(s, "2flip")[1])
+        check(n_pairs == N * (N - 1) // 2, f"2flip must score every pair exactly once for N={N}")
+
+
+def test_multiflip_tabu_consistency():
+    multiflip = import_multiflip()
+    import numpy as np
+
+    rng = np.random.default_rng(4)
+    for move_set in multiflip.MOVE_SETS:
+        s0 = rng.choice([-1, 1], size=14).astype(np.int32)
+        best, best_e = multiflip.tabu_search(s0, iters=40, rng=rng, move_set=move_set)
+        check(best_e == ref_labs_energy(best.tolist()), f"tabu_search({move_set}) best_e must match its sequence")
+        check(best_e <= ref_labs_energy(s0.tolist()), f"tabu_search({move_set}) must not return worse than the start")
+
+
+def ref_statevector_circuit(N, ops):
+    # Dense reference simulator for (name, params...) gate tuples,
+    # qubit 0 = most significant bit (CUDA-Q bitstring order)
+    import numpy as np
+
+    def one(psi, U, q):
+        v = psi.reshape(2 ** q, 2, -1)
+        return np.einsum("ab,xby->xay", U, v).reshape(-1)
+
+    def cx(psi, c, t):
+        v = psi.reshape((2,) * N).copy()
+        idx = [slice(None)] * N
+        idx[c] = 1
+        v[tuple(idx)] = np.flip(v[tuple(idx)], axis=t if t < c else t - 1)
+        return v.reshape(-1)
+
+    H = np.array([[1, 1], [1, -1]]) / math.sqrt(2)
+    psi = np.zeros(2 ** N, dtype=complex)
+    psi[0] = 1.0
+    for op in ops:
+        if op[0] == "h":
+            psi = one(psi, H, op[1])
+        elif op[0] == "rx":
+            c, s = math.cos(op[1] / 2), math.sin(op[1] / 2)
+            psi = one(psi, np.array([[c, -1j * s], [-1j * s, c]]), op[2])
+        elif op[0] == "rz":
+            psi = one(psi, np.diag([np.exp(-0.5j * op[1]), np.exp(0.5j * op[1])]), op[2])
+        elif op[0] == "cx":
+            psi = cx(psi, op[1], op[2])
+    return psi
+
+
+def test_mps_matches_statevector():
+    mps_sim = import_mps()
+    import numpy as np
+
+    rng = random.Random(5)
+    N = 7
+    ops = []
+    for _ in range(60):
+        kind = rng.choice(["h", "rx", "rz", "cx", "zz"])
+        theta = rng.uniform(-3, 3)
+        if kind == "h":
+            ops.append(("h", rng.randrange(N)))
+        elif kind in ("rx", "rz"):
+            ops.append((kind, theta, rng.randrange(N)))
+        elif kind == "cx":
+            c, t = rng.sample(range(N), 2)
+            ops.append(("cx", c, t))
+        else:
+            ops.append(("zz", theta, rng.sample(range(N), rng.choice([2, 4]))))
+
+    m = mps_sim.MPS(N, max_bond=64)
+    for op in ops:
+        if op[0] == "h":
+            m.h(op[1])
+        elif op[0] == "rx":
+            m.rx(op[1], op[2])
+        elif op[0] == "rz":
+            m.rz(op[1], op[2])
+        elif op[0] == "cx":
+            m.cx(op[1], op[2])
+        else:
+            m.zz_string(op[1], op[2])
+
+    # Reference expands every zz into CX ladder -> rz -> CX ladder (Rzz / Rzzzz)
+    ref_ops = []
+    for op in ops:
+        if op[0] == "zz":
+            qs = op[2]
+            ladder = [("cx", q, qs[-1]) for q in qs[:-1]]
+            ref_ops.extend(ladder + [("rz", op[1], qs[-1])] + ladder[::-1])
+        else:
+            ref_ops.append(op)
+    ref = ref_statevector_circuit(N, ref_ops)
+    check(np.allclose(m.to_statevector(), ref, atol=1e-10), "MPS state must match the dense statevector")
+    check(m.truncation_error < 1e-10, "No truncation expected with max_bond >= 2^(N/2)")
+
+    # Sampled frequencies follow |psi|^2
+    bits = m.sample(50000, seed=0)
+    idx = bits.astype(np.int64) @ (1 << np.arange(N - 1, -1, -1))
+    emp = np.bincount(idx, minlength=2 ** N) / 50000
+    tv = 0.5 * np.abs(emp - np.abs(ref) ** 2).sum()
+    check(tv < 0.05, f"MPS samples deviate from |psi|^2 (total variation {tv:.3f})")
+
+
+def test_mps_truncation_reported():
+    mps_sim = import_mps()
+
+    N = 10
+    G2, G4 = mps_sim.get_interactions(N)
+    args = (N, mps_sim.flatten_G2(G2), mps_sim.flatten_G4(G4), 1, 1.0, 1.0, [0.3])
+    exact = mps_sim.trotterized_circuit_flat_mps(*args, max_bond=64)
+    small = mps_sim.trotterized_circuit_flat_mps(*args, max_bond=2)
+    check(max(small.bond_dims()) <= 2, "max_bond must cap every bond dimension")
+    check(small.truncation_error > exact.truncation_error, "Truncating to max_bond=2 must report a larger truncation error")
+    check(abs(exact.fidelity - 1.0) < 1e-9, "Untruncated MPS must report fidelity 1")
+    check(0.0 < small.fidelity < 1.0, "Truncated MPS must report a fidelity in (0, 1)")
+
+    counts = small.mz(100, seed=1)
+    check(sum(counts.values()) == 100, "mz must return exactly `shots` samples")
+    check(all(len(b) == N and set(b) <= {"0", "1"} for b in counts), "mz bitstrings must have N binary characters")
+
+    # Truncated states stay normalised, and the reported fidelity tracks the
+    # true overlap: exactly for one gate, approximately over a circuit
+    import numpy as np
+    N = 8
+    G2, G4 = mps_sim.get_interactions(N)
+    args = (N, mps_sim.flatten_G2(G2), mps_sim.flatten_G4(G4), 1, 1.0, 1.0, [0.002])
+    ref = mps_sim.trotterized_circuit_flat_mps(*args, max_bond=64).to_statevector()
+    m = mps_sim.trotterized_circuit_flat_mps(*args, max_bond=4)
+    psi = m.to_statevector()
+    check(m.fidelity < 1.0, "max_bond=4 must truncate the N=8 circuit")
+    check(abs(np.linalg.norm(psi) - 1.0) < 1e-9, "Truncated MPS must stay normalised")
+    true_fid = abs(np.vdot(ref, psi)) ** 2
+    check(abs(m.fidelity - true_fid) < 0.01, f"Reported fidelity {m.fidelity:.4f} far from exact {true_fid:.4f}")
+
+    f0 = m.fidelity
+    ref_gate = mps_sim.MPS(N, max_bond=64)
+    ref_gate.tensors = [T.copy() for T in m.tensors]
+    ref_gate.center = m.center
+    ref_gate.zz_string(0.7, [0, 3, 5, 7])
+    m.zz_string(0.7, [0, 3, 5, 7])
+    gate_fid = abs(np.vdot(ref_gate.to_statevector(), m.to_statevector())) ** 2
+    check(abs(m.fidelity / f0 - gate_fid) < 1e-9, "Per-gate fidelity must equal the exact overlap")
+    check(abs(np.linalg.norm(m.to_statevector()) - 1.0) < 1e-9, "Truncated MPS must stay normalised")
+
+
+def test_landscape_matches_reference():
+    landscape = import_landscape()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for N in range(3, 11):
+            # Small chunks + 2 workers exercise the parallel memmap writes
+            landscape.build_landscape(N, cache_dir=cache_dir, workers=2, chunk=64)
+            E, ground = landscape.get_landscape(N, cache_dir=cache_dir)
+            check(E.shape == (2 ** N,), f"Landscape for N={N} must have 2^N entries")
+
+            ref = []
+            for idx in range(2 ** N):
+                bits = landscape.index_to_bitstring(idx, N)
+                spins = [+1 if b == "0" else -1 for b in bits]
+                ref.append(ref_labs_energy(spins))
+                check(int(E[idx]) == ref[-1], f"Landscape mismatch for N={N}, bitstring {bits}")
+
+            e_min = min(ref)
+            expected = [i for i, e in enumerate(ref) if e == e_min]
+            check(sorted(int(i) for i in ground) == expected, f"Ground-state index wrong for N={N}")
+
+
+def test_landscape_cache_reuse():
+    landscape = import_landscape()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        E1, _ = landscape.get_landscape(8, cache_dir=cache_dir)
+        E2, _ = landscape.get_landscape(8, cache_dir=cache_dir)
+        check(E1.filename == E2.filename, "Second get_landscape call must map the cached file")
+        check(E2.flags.writeable is False, "Cached landscape must be mapped read-only")
+
+        counts = {bits: 1 for bits in ("".join(p) for p in itertools.product("01", repeat=8))}
+        energies, freqs = landscape.counts_energies(counts, 8, cache_dir=cache_dir)
+        check(int(freqs.sum()) == 256, "counts_energies must keep one frequency per bitstring")
+        check(int(energies.min()) == landscape.ground_energy(8, cache_dir=cache_dir),
+              "Minimum sampled energy over all bitstrings must be the ground energy")
+
+
 def main():
     tests = [
         ("LABS energy matches reference", test_energy_matches_reference),
@@ -172,6 +423,13 @@ def main():
         ("Energy is nonnegative integer", test_energy_nonnegative_and_integer),
         ("Brute force best is consistent (small N)", test_bruteforce_consistency_smallN),
         ("QAOA smoke test (small N)", test_qaoa_smoketest_smallN_fast),
+        ("Batched QAOA grid evaluation (small N)", test_qaoa_batched_smallN),
+        ("Multi-flip move energies match reference", test_multiflip_scores_match_reference),
+        ("Multi-flip tabu search is consistent", test_multiflip_tabu_consistency),
+        ("MPS simulator matches statevector (no truncation)", test_mps_matches_statevector),
+        ("MPS truncation is capped and reported", test_mps_truncation_reported),
+        ("Energy landscape matches reference (small N)", test_landscape_matches_reference),
+        ("Energy landscape cache is reused and read-only", test_landscape_cache_reuse),
     ]
 
     ok = 0